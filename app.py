@@ -1,8 +1,8 @@
 import streamlit as st
-import joblib
 import pandas as pd
 from pathlib import Path
-import preprocessing as pr
+import inference_telemetry as it
+import model_holder as mh
 
 
 st.set_page_config(
@@ -49,12 +49,24 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 #model
+def instrument(model):
+    model = it.InstrumentedPipeline(model)
+    model.start_periodic_snapshot(Path("data/inference_telemetry.json"), interval=60)
+    return model
+
+
+def retire(old, new):
+    if old is not None:
+        old.stop_periodic_snapshot()
+
+
+# one holder per server process; it swaps in a new model whenever main.py
+# rewrites the artifact, without restarting the app
 @st.cache_resource
-def load_model():
-    model_path = Path("data/amazon_sentiment_lr_model.joblib")
-    if not model_path.exists():
-        return None
-    return joblib.load(model_path)
+def load_model_holder():
+    return mh.ModelHolder(
+        Path("data/amazon_sentiment_lr_model.joblib"), wrap=instrument, on_swap=retire
+    )
 
 # Main app
 def main():
@@ -62,11 +74,16 @@ def main():
     st.markdown('<div class="main-header">⭐ Amazon Review Sentiment Analyzer</div>', unsafe_allow_html=True)
     st.markdown('<div class="sub-header">AI-Powered Sentiment Analysis for Product Reviews</div>', unsafe_allow_html=True)
 
-    model = load_model()
+    holder = load_model_holder()
+    # take one reference per rerun so a concurrent swap cannot change the
+    # model halfway through a prediction
+    model = holder.get()
 
     if model is None:
         st.error("⚠️ Model not found! Please train the model first by running `python main.py`")
         st.info("After training, the model will be saved to `data/amazon_sentiment_lr_model.joblib`")
+        if holder.last_error:
+            st.warning(f"Last load attempt was rejected: {holder.last_error}")
         return
 
     # Sidebar with info
@@ -89,6 +106,27 @@ def main():
         3. View the prediction and confidence score
         """)
 
+        st.header("🔄 Active Model")
+        status = holder.status()
+        st.write(f"Version: **{status['active_version']}**")
+        if status["last_reload"]:
+            st.write(f"Last swap: {status['last_reload']['loaded_at']}, "
+                     f"load+validate {status['last_reload']['total_seconds']:.2f}s, "
+                     f"swap {status['last_reload']['swap_seconds'] * 1e6:.1f}µs")
+        if status["last_error"]:
+            st.warning(f"Rejected reload: {status['last_error']}")
+
+        st.header("⏱️ Inference Telemetry")
+        snapshot = model.snapshot()
+        st.write(f"Requests: **{snapshot['requests']}** | Rows: **{snapshot['rows']}**")
+        st.write(f"Cache hit rate: **{snapshot['cache']['hit_rate']:.0%}**")
+        with st.expander("Stage latencies"):
+            for stage, hist in snapshot["latency_seconds"].items():
+                if hist["count"]:
+                    p95 = f"≤ {hist['p95'] * 1000:g} ms" if hist["p95"] is not None else "> 5 s"
+                    st.write(f"{stage}: mean {hist['mean'] * 1000:.2f} ms, p95 {p95}")
+        st.download_button("Prometheus metrics", model.to_prometheus(), file_name="metrics.txt")
+
         st.header("💡 Example Reviews")
         if st.button("Try Positive Example"):
             st.session_state['example_text'] = "This product is absolutely amazing! Best purchase ever. The quality is outstanding and it exceeded all my expectations. Highly recommend!"
@@ -119,11 +157,11 @@ def main():
 
         if analyze_button and review_text.strip():
             # Preprocess 
-            cleaned_text = pr.cleanText(review_text)
+            cleaned_text = model.clean([review_text])[0]
 
-            # prediction
-            prediction = model.predict([cleaned_text])[0]
+            # prediction (a single pass; the label is the most probable class)
             probability = model.predict_proba([cleaned_text])[0]
+            prediction = model.classes_[probability.argmax()]
 
             # Display results
             st.subheader("🎯 Analysis Results")
@@ -0,0 +1,220 @@
+### CONCURRENT PREDICTION
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import joblib
+import kagglehub
+import numpy as np
+import pandas as pd
+import preprocessing as pr
+
+MODES = ("single", "thread", "process", "hybrid")
+
+# set once per worker process by the pool initializer, so the fitted
+# vectorizer/pipeline is pickled once per worker instead of once per shard
+_worker_estimator = None
+
+
+def _init_worker(estimator):
+    global _worker_estimator
+    _worker_estimator = estimator
+
+
+def _worker_transform(texts: list):
+    return _worker_estimator.transform(texts)
+
+
+def _worker_predict_proba(texts: list):
+    return _worker_estimator.predict_proba(texts)
+
+
+class ConcurrentPredictor:
+    # shards a batch over a worker pool. TfidfVectorizer's analyzer is pure
+    # Python and holds the GIL, so threads only help for the sparse
+    # dot-product/probability part; tokenization scales with processes.
+    #   single  - the bare pipeline, no pool
+    #   thread  - whole pipeline per shard on a thread pool
+    #   process - whole pipeline per shard on a process pool
+    #   hybrid  - tokenization on a process pool, classification on threads
+    def __init__(
+        self,
+        model,
+        mode: str = "hybrid",
+        n_workers: int = None,
+        min_shard_size: int = 256,
+    ):
+        assert mode in MODES, f"Unknown mode {mode!r}, expected one of {MODES}"
+        self.model = model
+        self.vectorizer = model.named_steps["tfidf"]
+        self.classifier = model.named_steps["clf"]
+        self.classes_ = model.classes_
+        self.mode = mode
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.min_shard_size = min_shard_size
+
+        self._threads = None
+        self._processes = None
+        # forkserver, not the Linux default fork: hosts like app.py run other
+        # threads, and a forked worker can inherit a lock held by one of them.
+        # The estimator reaches workers through the initializer either way.
+        mp_context = multiprocessing.get_context("forkserver")
+        if mode in ("thread", "hybrid"):
+            self._threads = ThreadPoolExecutor(self.n_workers)
+        if mode == "process":
+            self._processes = ProcessPoolExecutor(
+                self.n_workers,
+                mp_context=mp_context,
+                initializer=_init_worker,
+                initargs=(model,),
+            )
+        elif mode == "hybrid":
+            self._processes = ProcessPoolExecutor(
+                self.n_workers,
+                mp_context=mp_context,
+                initializer=_init_worker,
+                initargs=(self.vectorizer,),
+            )
+
+    def n_shards(self, n_rows: int) -> int:
+        # at most one shard per worker, and never smaller than min_shard_size,
+        # so small batches are not drowned in scheduling/pickling overhead
+        return max(1, min(self.n_workers, n_rows // self.min_shard_size))
+
+    def uses_pool(self, n_rows: int) -> bool:
+        # batches that fit in one shard run inline on the calling thread
+        return self.mode != "single" and self.n_shards(n_rows) > 1
+
+    def warm_up(self, texts: list):
+        # starts every pool worker (running the initializer, which pickles the
+        # estimator) so that start-up cost stays out of any timing
+        sample = [list(texts[:1])] * self.n_workers
+        if self._processes is not None:
+            fn = _worker_predict_proba if self.mode == "process" else _worker_transform
+            list(self._processes.map(fn, sample))
+        if self._threads is not None:
+            features = self.vectorizer.transform(sample[0])
+            list(
+                self._threads.map(
+                    self.classifier.predict_proba, [features] * self.n_workers
+                )
+            )
+
+    def _shards(self, texts: list) -> list:
+        n_shards = self.n_shards(len(texts))
+        bounds = np.linspace(0, len(texts), n_shards + 1).astype(int)
+        return [texts[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+    def predict_proba(self, texts) -> np.ndarray:
+        texts = list(texts)
+        shards = self._shards(texts)
+
+        if self.mode == "single" or len(shards) == 1:
+            return self.model.predict_proba(texts)
+
+        if self.mode == "thread":
+            parts = self._threads.map(self.model.predict_proba, shards)
+            return np.vstack(list(parts))
+
+        if self.mode == "process":
+            return np.vstack(list(self._processes.map(_worker_predict_proba, shards)))
+
+        # hybrid: features come back as CSR shards, classified on threads
+        features = self._processes.map(_worker_transform, shards)
+        parts = [
+            self._threads.submit(self.classifier.predict_proba, X) for X in features
+        ]
+        return np.vstack([p.result() for p in parts])
+
+    def predict(self, texts) -> np.ndarray:
+        return self.classes_[self.predict_proba(texts).argmax(axis=1)]
+
+    def close(self):
+        if self._threads is not None:
+            self._threads.shutdown()
+        if self._processes is not None:
+            self._processes.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def benchmark_executors(
+    model,
+    texts: list,
+    batch_sizes=(1, 64, 1024, 16384),
+    modes=MODES,
+    n_workers: int = None,
+    min_shard_size: int = 16,
+    repeats: int = 3,
+) -> pd.DataFrame:
+    # rows/second of each mode over the same texts, best of `repeats`. A batch
+    # that gets a single shard (too small, or only one worker) runs inline
+    # whatever the mode; such rows are reported with executor="inline" so
+    # they are not mistaken for pool results.
+    texts = list(texts)
+    rows = []
+    for mode in modes:
+        with ConcurrentPredictor(
+            model, mode=mode, n_workers=n_workers, min_shard_size=min_shard_size
+        ) as predictor:
+            predictor.warm_up(texts)
+            for batch_size in batch_sizes:
+                if batch_size > len(texts):
+                    continue
+                pooled = predictor.uses_pool(batch_size)
+                executor = mode if pooled or mode == "single" else "inline"
+                n = min(len(texts), max(batch_size, 4096))
+                batches = [
+                    texts[i : i + batch_size]
+                    for i in range(0, n - batch_size + 1, batch_size)
+                ]
+                best = float("inf")
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    for batch in batches:
+                        predictor.predict_proba(batch)
+                    best = min(best, time.perf_counter() - start)
+                n_rows = sum(len(b) for b in batches)
+                rows.append(
+                    {
+                        "mode": mode,
+                        "executor": executor,
+                        "n_shards": predictor.n_shards(batch_size) if pooled else 1,
+                        "batch_size": batch_size,
+                        "rows": n_rows,
+                        "seconds": best,
+                        "rows_per_second": n_rows / best,
+                    }
+                )
+                print(
+                    f"{mode:<8} batch={batch_size:<6} {n_rows / best:>12,.0f} rows/s"
+                    + ("" if executor == mode else "  (inline: only one shard)")
+                )
+
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    model = joblib.load("data/amazon_sentiment_lr_model.joblib")
+
+    # the same cleaning the model was trained with
+    path = kagglehub.dataset_download("snap/amazon-fine-food-reviews")
+    X, _ = pr.prepareDataset(
+        pr.loadData(path), drop3Stars=True, subSample=50_000, random_state=0
+    )
+
+    results = benchmark_executors(model, X.tolist())
+    # inline rows are dropped from the table: they measure the single path
+    results = results[results["executor"] != "inline"]
+    if results["mode"].nunique() < 2:
+        print("Only one worker available: every pool mode ran inline.")
+    print(
+        results.pivot(index="batch_size", columns="mode", values="rows_per_second")
+        .round(0)
+        .to_string()
+    )
@@ -1,8 +1,18 @@
-import joblib
 import numpy as np
+import json
 import pandas as pd
+import inference_telemetry as it
+import model_holder as mh
 
-model = joblib.load("data/amazon_sentiment_lr_model.joblib")
+# the holder picks up a retrained artifact in the background, no restart needed
+holder = mh.ModelHolder(
+    "data/amazon_sentiment_lr_model.joblib", wrap=it.InstrumentedPipeline
+)
+assert holder.get() is not None, (
+    f"Model could not be loaded: {holder.last_error}"
+    if holder.last_error
+    else "Model not found, run main.py first"
+)
 
 test_cases = [
     # Sarcasm & Irony
@@ -50,6 +60,11 @@ test_cases = [
 
 while 1:
     text_input = str(input(("enter a review:")))
+    model = holder.get()
+
+    if text_input == "version":
+        print(json.dumps(holder.status(), indent=2))
+        continue
     if text_input == "tc":
         for i, review in enumerate(test_cases, 1):
             result = model.predict([review])
@@ -61,8 +76,8 @@ while 1:
             print(f"   Probabilities: {probabilities}")
 
     if text_input == "tf":
-        vectorizer = model.named_steps["tfidf"]
-        classifier = model.named_steps["clf"]
+        vectorizer = model.vectorizer
+        classifier = model.classifier
 
         feature_names = vectorizer.get_feature_names_out()
         coefficients = classifier.coef_[0]
@@ -82,6 +97,10 @@ while 1:
             print(f"{row['feature']:30s} | {row['weight']:+.4f}")
         print()
 
+    if text_input == "stats":
+        print(json.dumps(model.snapshot(), indent=2))
+        continue
+
     result = model.predict([text_input])
     probabilities = model.predict_proba([text_input])
 
@@ -4,6 +4,7 @@ from sklearn.model_selection import train_test_split
 import preprocessing as pr
 import model_training as mt
 import model_evaluation as me
+import model_significance as ms
 
 SUBSAMPLE = 50000
 DROP3STARS = True
@@ -32,11 +33,15 @@ model = mt.train_model_final(X_train, y_train)
 y_pred = model.predict(X_test)
 y_prob = model.predict_proba(X_test)[:, 1]
 me.dump_model_stats(y_test, y_pred, y_prob)
+ms.dump_bootstrap_ci(ms.bootstrap_ci(y_test, y_pred, y_prob))
 me.make_model_graph(y_pred)
 
 # END OF PROGRAM
 # persist artifacts
 df.to_csv(out_csv, index=False)
 print(f"Saved: {out_csv}")
-joblib.dump(model, model_pkl)
+# write next to the target and rename, so a running app never sees a partial file
+tmp_pkl = model_pkl.with_suffix(".joblib.tmp")
+joblib.dump(model, tmp_pkl)
+tmp_pkl.replace(model_pkl)
 print(f"Saved model: {model_pkl}")
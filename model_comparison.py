@@ -8,6 +8,7 @@ from textblob import TextBlob
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 import joblib
 import preprocessing as pr
+import model_significance as ms
 
 SUBSAMPLE = 50000
 DROP3STARS = True
@@ -139,6 +140,37 @@ def compare_all(X_test: pd.Series, y_test: pd.Series):
             f"{model_name:<40} {result['accuracy']:>12.4f} {result['f1_score']:>12.4f}"
         )
 
+    # bootstrap intervals and paired tests against our model, so small
+    # accuracy/F1 gaps are not mistaken for real differences
+    print("\n" + "=" * 40)
+    print("SIGNIFICANCE VS OUR MODEL")
+    print("=" * 40)
+    print(f"{'Model':<20} {'F1 95% CI':>20} {'dF1 95% CI':>22} {'McNemar p':>12}")
+    print("-" * 40)
+
+    baseline = results["custom"]["predictions"]
+    for model_name, result in results.items():
+        ci = ms.bootstrap_ci(y_test, result["predictions"], random_state=0)
+        result["bootstrap_ci"] = ci
+        f1_ci = (
+            f"[{ci.loc['f1_score', 'ci_low']:.4f}, {ci.loc['f1_score', 'ci_high']:.4f}]"
+        )
+
+        if model_name == "custom":
+            print(f"{model_name:<20} {f1_ci:>20}")
+            continue
+
+        paired = ms.paired_bootstrap(
+            y_test, baseline, result["predictions"], random_state=0
+        )
+        mcnemar = ms.mcnemar_test(y_test, baseline, result["predictions"])
+        result["paired_vs_custom"] = paired
+        result["mcnemar_vs_custom"] = mcnemar
+        delta_ci = f"[{paired.loc['f1_score', 'ci_low']:+.4f}, {paired.loc['f1_score', 'ci_high']:+.4f}]"
+        print(
+            f"{model_name:<20} {f1_ci:>20} {delta_ci:>22} {mcnemar['p_value']:>12.2e}"
+        )
+
     return results
 
 
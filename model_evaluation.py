@@ -1,3 +1,4 @@
+from pathlib import Path
 from matplotlib import pyplot as plt
 import numpy as np
 import pandas as pd
@@ -36,3 +37,120 @@ def print_missclassified_test_cases(
         print(f"   True: {y_test.iloc[idx]} | Predicted: {y_pred[idx]}")
 
     print("\n" + "=" * 100)
+
+
+class StreamingEvaluator:
+    # accumulates binary classification metrics chunk by chunk, so the full
+    # y_test / y_pred / y_prob arrays never need to be held in memory at once.
+    # ROC-AUC is approximated from fixed-width histograms of the positive class
+    # probability: memory is O(n_bins) regardless of how many rows are seen.
+    def __init__(self, n_bins: int = 1000):
+        self.n_bins = n_bins
+        self.confusion = np.zeros((2, 2), dtype=np.int64)
+        self.pos_hist = np.zeros(n_bins, dtype=np.int64)
+        self.neg_hist = np.zeros(n_bins, dtype=np.int64)
+        self.n_rows = 0
+
+    def update(self, y_true, y_pred, y_prob=None):
+        y_true = np.asarray(y_true, dtype=np.int64)
+        y_pred = np.asarray(y_pred, dtype=np.int64)
+        assert y_true.shape == y_pred.shape, "y_true and y_pred length mismatch"
+
+        # row index = true class, column index = predicted class (sklearn layout)
+        self.confusion += np.bincount(y_true * 2 + y_pred, minlength=4).reshape(2, 2)
+        self.n_rows += len(y_true)
+
+        if y_prob is not None:
+            y_prob = np.asarray(y_prob, dtype=np.float64)
+            assert y_prob.shape == y_true.shape, "y_true and y_prob length mismatch"
+            bins = np.clip((y_prob * self.n_bins).astype(np.int64), 0, self.n_bins - 1)
+            self.pos_hist += np.bincount(bins[y_true == 1], minlength=self.n_bins)
+            self.neg_hist += np.bincount(bins[y_true == 0], minlength=self.n_bins)
+
+        return self
+
+    def confusion_matrix(self) -> np.ndarray:
+        return self.confusion.copy()
+
+    def per_class_metrics(self) -> pd.DataFrame:
+        tp = np.diag(self.confusion).astype(np.float64)
+        predicted = self.confusion.sum(axis=0)
+        support = self.confusion.sum(axis=1)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            precision = np.where(predicted > 0, tp / predicted, 0.0)
+            recall = np.where(support > 0, tp / support, 0.0)
+            f1 = np.where(
+                precision + recall > 0,
+                2 * precision * recall / (precision + recall),
+                0.0,
+            )
+
+        return pd.DataFrame(
+            {"precision": precision, "recall": recall, "f1-score": f1, "support": support},
+            index=pd.Index([0, 1], name="class"),
+        )
+
+    def accuracy(self) -> float:
+        if self.n_rows == 0:
+            return float("nan")
+        return np.trace(self.confusion) / self.n_rows
+
+    def roc_auc(self) -> float:
+        n_pos = self.pos_hist.sum()
+        n_neg = self.neg_hist.sum()
+        if n_pos == 0 or n_neg == 0:
+            return float("nan")
+
+        # every positive beats the negatives in lower bins and ties (counts half)
+        # with the negatives in its own bin -> trapezoidal AUC over bin edges
+        neg_below = np.cumsum(self.neg_hist) - self.neg_hist
+        wins = (self.pos_hist * (neg_below + 0.5 * self.neg_hist)).sum()
+        return wins / (n_pos * n_neg)
+
+    def dump_stats(self):
+        print("\nClassification report:\n", self.per_class_metrics().round(3))
+        print("Accuracy:", round(self.accuracy(), 3), f"({self.n_rows:,} rows)")
+        print("Confusion matrix:\n", self.confusion)
+        print(f"ROC-AUC (approx., {self.n_bins} bins):", self.roc_auc())
+
+
+def score_in_chunks(model, X: pd.Series, chunk_size: int = 10_000):
+    # yields (y_pred, y_prob) per chunk; the label is derived from the
+    # probabilities so the pipeline only runs once per chunk
+    classes = model.classes_
+    for start in range(0, len(X), chunk_size):
+        chunk = X.iloc[start : start + chunk_size]
+        proba = model.predict_proba(chunk)
+        yield classes[proba.argmax(axis=1)], proba[:, 1]
+
+
+def evaluate_in_chunks(
+    model, X: pd.Series, y: pd.Series, chunk_size: int = 10_000, n_bins: int = 1000
+) -> StreamingEvaluator:
+    evaluator = StreamingEvaluator(n_bins=n_bins)
+    y = np.asarray(y)
+    offset = 0
+    for y_pred, y_prob in score_in_chunks(model, X, chunk_size):
+        evaluator.update(y[offset : offset + len(y_pred)], y_pred, y_prob)
+        offset += len(y_pred)
+    return evaluator
+
+
+def evaluate_scored_csv(
+    csv_path: Path,
+    label_col: str = "sentiment_label",
+    pred_col: str = "pred",
+    prob_col: str = "prob",
+    chunk_size: int = 100_000,
+    n_bins: int = 1000,
+) -> StreamingEvaluator:
+    # evaluates a scored file that does not fit in memory, reading only the
+    # needed columns chunk by chunk
+    usecols = [label_col, pred_col] + ([prob_col] if prob_col else [])
+    evaluator = StreamingEvaluator(n_bins=n_bins)
+    for chunk in pd.read_csv(csv_path, usecols=usecols, chunksize=chunk_size):
+        evaluator.update(
+            chunk[label_col], chunk[pred_col], chunk[prob_col] if prob_col else None
+        )
+    return evaluator
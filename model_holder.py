@@ -0,0 +1,175 @@
+### MODEL HOT-RELOAD
+
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+import joblib
+import numpy as np
+
+# clear-cut reviews a usable model must get right before it is swapped in
+SMOKE_TEXTS = [
+    "this product is absolutely amazing best purchase ever highly recommend",
+    "great taste and the quality is outstanding i love it",
+    "terrible product complete waste of money very disappointed",
+    "awful quality it broke after one use do not buy",
+]
+SMOKE_LABELS = [1, 1, 0, 0]
+
+
+def artifact_version(path: Path):
+    # (mtime_ns, size) changes whenever main.py rewrites the artifact
+    try:
+        stat = Path(path).stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def format_version(version) -> str:
+    if version is None:
+        return "none"
+    mtime_ns, size = version
+    stamp = datetime.fromtimestamp(mtime_ns / 1e9).strftime("%Y-%m-%d %H:%M:%S")
+    return f"{stamp} ({size / 1e6:.1f} MB)"
+
+
+def validate_model(
+    model, smoke_texts=SMOKE_TEXTS, smoke_labels=SMOKE_LABELS, min_accuracy=0.75
+):
+    # raises AssertionError if the model is not fit to serve
+    proba = np.asarray(model.predict_proba(smoke_texts))
+    assert proba.shape == (len(smoke_texts), 2), f"Bad proba shape: {proba.shape}"
+    assert np.isfinite(proba).all(), "Non-finite probabilities"
+    assert np.allclose(proba.sum(axis=1), 1.0), "Probabilities do not sum to 1"
+
+    predictions = np.asarray(model.classes_)[proba.argmax(axis=1)]
+    accuracy = np.mean(predictions == np.asarray(smoke_labels))
+    assert accuracy >= min_accuracy, f"Smoke-set accuracy too low: {accuracy:.2f}"
+
+
+class ModelHolder:
+    # keeps the currently served model and replaces it when the artifact on
+    # disk changes. Loading and validation happen on a background thread; the
+    # swap itself is a single reference assignment, so a request that already
+    # called get() finishes on the model it started with.
+    def __init__(
+        self,
+        path: Path,
+        wrap=None,
+        on_swap=None,
+        poll_interval: float = 2.0,
+        start: bool = True,
+    ):
+        self.path = Path(path)
+        self.wrap = wrap
+        self.on_swap = on_swap
+        self.poll_interval = poll_interval
+
+        self._current = (None, None)  # (model, version), swapped as one object
+        self._swap_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.n_swaps = 0
+        self.last_error = None
+        self.rejected_version = None
+        self.last_reload = {}
+
+        # the first load is synchronous so the caller has a model right away
+        if artifact_version(self.path) is not None:
+            self.reload()
+        if start:
+            self.start()
+
+    def get(self):
+        return self._current[0]
+
+    @property
+    def version(self):
+        return self._current[1]
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._watch, name="model-hot-reload", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _watch(self):
+        pending = None
+        while not self._stop.wait(self.poll_interval):
+            version = artifact_version(self.path)
+            if version is None or version in (self.version, self.rejected_version):
+                pending = None
+                continue
+            # only load once the file has stopped changing for one poll, so a
+            # half-written artifact is never picked up
+            if version != pending:
+                pending = version
+                continue
+            try:
+                self.reload()
+            except Exception as e:
+                # one bad reload must never end the polling loop
+                self.last_error = f"{format_version(version)}: {e!r}"
+                print(f"Model reload failed: {self.last_error}")
+            pending = None
+
+    def reload(self) -> bool:
+        version = artifact_version(self.path)
+        detected = time.perf_counter()
+        try:
+            model = joblib.load(self.path)
+            loaded = time.perf_counter()
+            validate_model(model)
+            validated = time.perf_counter()
+            # wrapping can fail too (e.g. a pipeline without the expected
+            # named steps); that is a rejection, like a failed validation
+            if self.wrap is not None:
+                model = self.wrap(model)
+        except Exception as e:
+            # keep serving the previous model; retry when the file changes again
+            self.rejected_version = version
+            self.last_error = f"{format_version(version)}: {e!r}"
+            print(f"Model reload rejected: {self.last_error}")
+            return False
+
+        with self._swap_lock:
+            swap_start = time.perf_counter()
+            old = self._current[0]
+            self._current = (model, version)
+            swapped = time.perf_counter()
+            self.n_swaps += 1
+
+        self.last_error = None
+        self.last_reload = {
+            "version": format_version(version),
+            "loaded_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "load_seconds": loaded - detected,
+            "validate_seconds": validated - loaded,
+            "swap_seconds": swapped - swap_start,
+            "total_seconds": swapped - detected,
+        }
+        print(f"Model swapped in: {self.last_reload}")
+
+        if self.on_swap is not None:
+            try:
+                self.on_swap(old, model)
+            except Exception as e:
+                # the swap already happened; only report the callback failure
+                print(f"on_swap callback failed: {e!r}")
+        return True
+
+    def status(self) -> dict:
+        return {
+            "path": str(self.path),
+            "active_version": format_version(self.version),
+            "n_swaps": self.n_swaps,
+            "last_reload": self.last_reload,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,231 @@
+### BOOTSTRAP CONFIDENCE INTERVALS AND PAIRED SIGNIFICANCE TESTS
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+
+def _resampled_indices(n: int, n_resamples: int, block_size: int, rng):
+    # yields (block, n) matrices of row indices drawn with replacement;
+    # resampling in blocks keeps memory at block_size * n integers
+    for start in range(0, n_resamples, block_size):
+        b = min(block_size, n_resamples - start)
+        yield rng.integers(0, n, size=(b, n), dtype=np.int32)
+
+
+def _row_bincount(codes: np.ndarray, n_codes: int) -> np.ndarray:
+    # one bincount per resample (row) in a single call by offsetting each row
+    b = codes.shape[0]
+    offset = codes + (np.arange(b) * n_codes)[:, None]
+    return np.bincount(offset.ravel(), minlength=b * n_codes).reshape(b, n_codes)
+
+
+def _auc_codes(y_true: np.ndarray, y_prob: np.ndarray, n_bins: int = None):
+    # maps every row to (label, score group) so a resample's score histogram
+    # is a single bincount; groups are numbered in ascending score. With
+    # n_bins=None every distinct score is its own group (exact AUC, but up to
+    # n groups per resample); otherwise scores are quantized to n_bins equal
+    # bins over their range, as StreamingEvaluator does, and pairs sharing a
+    # bin count as ties.
+    if n_bins is None:
+        _, group = np.unique(y_prob, return_inverse=True)
+    else:
+        low, high = y_prob.min(), y_prob.max()
+        scaled = (y_prob - low) / (high - low) if high > low else y_prob * 0.0
+        group = np.minimum((scaled * n_bins).astype(np.int64), n_bins - 1)
+    n_groups = group.max() + 1
+    return (y_true == 1) * n_groups + group, n_groups
+
+
+def _metrics_from_indices(
+    idx: np.ndarray, y_true: np.ndarray, y_pred: np.ndarray, auc_codes=None
+) -> dict:
+    # confusion matrix entries (tn, fp, fn, tp) for every resample at once
+    confusion = _row_bincount((y_true * 2 + y_pred)[idx], 4).astype(np.float64)
+    tn, fp, fn, tp = confusion.T
+    total = confusion.sum(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        metrics = {
+            "accuracy": (tp + tn) / total,
+            "precision": tp / (tp + fp),
+            "recall": tp / (tp + fn),
+            "f1_score": 2 * tp / (2 * tp + fp + fn),
+        }
+
+    if auc_codes is not None:
+        metrics["roc_auc"] = _resampled_roc_auc(idx, *auc_codes)
+
+    return metrics
+
+
+def _resampled_roc_auc(idx: np.ndarray, codes: np.ndarray, n_groups: int):
+    # Mann-Whitney form of the AUC: each positive beats the negatives in lower
+    # score groups and ties (counts half) with the ones sharing its score
+    hist = _row_bincount(codes[idx], 2 * n_groups).reshape(len(idx), 2, n_groups)
+    neg = hist[:, 0]
+    pos = hist[:, 1]
+
+    # twice the win count, kept in integers: 2 * (negatives below) + ties
+    twice_neg_below = np.cumsum(neg, axis=1)
+    twice_neg_below *= 2
+    twice_neg_below -= neg
+    twice_wins = np.einsum("ij,ij->i", pos, twice_neg_below)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return twice_wins / (2.0 * pos.sum(axis=1) * neg.sum(axis=1))
+
+
+def _percentile_ci(values: np.ndarray, alpha: float):
+    # shared NaN policy: resamples where a metric is undefined (e.g. precision
+    # with no positive predictions) are dropped; if none are left, the
+    # interval is NaN rather than an error
+    values = values[np.isfinite(values)]
+    if len(values) == 0:
+        return values, float("nan"), float("nan")
+    low, high = np.percentile(values, [100 * alpha / 2, 100 * (1 - alpha / 2)])
+    return values, low, high
+
+
+def _as_arrays(y_true, *preds):
+    arrays = [np.asarray(y_true).astype(np.int64)]
+    for p in preds:
+        arrays.append(None if p is None else np.asarray(p))
+    n = len(arrays[0])
+    for a in arrays[1:]:
+        assert a is None or len(a) == n, "All prediction arrays must match y_true"
+    return arrays
+
+
+def bootstrap_ci(
+    y_true: pd.Series,
+    y_pred: pd.Series,
+    y_prob: pd.Series = None,
+    n_resamples: int = 2000,
+    alpha: float = 0.05,
+    block_size: int = 50,
+    random_state: int = None,
+    auc_bins: int = 10_000,
+) -> pd.DataFrame:
+    # the point estimate uses exact scores; resampled AUCs use auc_bins bins
+    y_true, y_pred, y_prob = _as_arrays(y_true, y_pred, y_prob)
+    y_pred = y_pred.astype(np.int64)
+    rng = np.random.default_rng(random_state)
+
+    exact_codes = auc_codes = None
+    if y_prob is not None:
+        exact_codes = _auc_codes(y_true, y_prob)
+        auc_codes = _auc_codes(y_true, y_prob, auc_bins)
+
+    point = _metrics_from_indices(
+        np.arange(len(y_true))[None, :], y_true, y_pred, exact_codes
+    )
+    samples = {name: [] for name in point}
+    for idx in _resampled_indices(len(y_true), n_resamples, block_size, rng):
+        for name, values in _metrics_from_indices(
+            idx, y_true, y_pred, auc_codes
+        ).items():
+            samples[name].append(values)
+
+    rows = {}
+    for name, values in samples.items():
+        _, low, high = _percentile_ci(np.concatenate(values), alpha)
+        rows[name] = {"estimate": point[name][0], "ci_low": low, "ci_high": high}
+
+    return pd.DataFrame.from_dict(rows, orient="index")
+
+
+def paired_bootstrap(
+    y_true: pd.Series,
+    pred_a: pd.Series,
+    pred_b: pd.Series,
+    prob_a: pd.Series = None,
+    prob_b: pd.Series = None,
+    n_resamples: int = 2000,
+    alpha: float = 0.05,
+    block_size: int = 50,
+    random_state: int = None,
+    auc_bins: int = 10_000,
+) -> pd.DataFrame:
+    # both models are scored on the *same* resampled rows, so the spread of
+    # the delta only reflects disagreement between them, not test-set noise
+    y_true, pred_a, pred_b, prob_a, prob_b = _as_arrays(
+        y_true, pred_a, pred_b, prob_a, prob_b
+    )
+    pred_a = pred_a.astype(np.int64)
+    pred_b = pred_b.astype(np.int64)
+    # exact scores for the point estimates, auc_bins bins for the resamples
+    exact_a = exact_b = codes_a = codes_b = None
+    if prob_a is not None and prob_b is not None:
+        exact_a = _auc_codes(y_true, prob_a)
+        exact_b = _auc_codes(y_true, prob_b)
+        codes_a = _auc_codes(y_true, prob_a, auc_bins)
+        codes_b = _auc_codes(y_true, prob_b, auc_bins)
+    rng = np.random.default_rng(random_state)
+
+    all_rows = np.arange(len(y_true))[None, :]
+    point_a = _metrics_from_indices(all_rows, y_true, pred_a, exact_a)
+    point_b = _metrics_from_indices(all_rows, y_true, pred_b, exact_b)
+
+    deltas = {name: [] for name in point_a}
+    for idx in _resampled_indices(len(y_true), n_resamples, block_size, rng):
+        metrics_a = _metrics_from_indices(idx, y_true, pred_a, codes_a)
+        metrics_b = _metrics_from_indices(idx, y_true, pred_b, codes_b)
+        for name in deltas:
+            deltas[name].append(metrics_a[name] - metrics_b[name])
+
+    rows = {}
+    for name, values in deltas.items():
+        values, low, high = _percentile_ci(np.concatenate(values), alpha)
+        # two-sided p-value: how often the resampled delta crosses zero
+        p_value = float("nan")
+        if len(values):
+            p_value = min(1.0, 2 * min((values <= 0).mean(), (values >= 0).mean()))
+        rows[name] = {
+            "a": point_a[name][0],
+            "b": point_b[name][0],
+            "delta": point_a[name][0] - point_b[name][0],
+            "ci_low": low,
+            "ci_high": high,
+            "p_value": p_value,
+        }
+
+    return pd.DataFrame.from_dict(rows, orient="index")
+
+
+def mcnemar_test(y_true: pd.Series, pred_a: pd.Series, pred_b: pd.Series) -> dict:
+    y_true, pred_a, pred_b = _as_arrays(y_true, pred_a, pred_b)
+    correct_a = pred_a == y_true
+    correct_b = pred_b == y_true
+
+    # only the discordant pairs carry information about which model is better
+    only_a = int(np.count_nonzero(correct_a & ~correct_b))
+    only_b = int(np.count_nonzero(~correct_a & correct_b))
+    discordant = only_a + only_b
+
+    if discordant == 0:
+        statistic, p_value, method = 0.0, 1.0, "none"
+    elif discordant < 25:
+        # too few disagreements for the chi-square approximation
+        statistic = float(min(only_a, only_b))
+        p_value = stats.binomtest(only_a, discordant, 0.5).pvalue
+        method = "exact"
+    else:
+        statistic = (abs(only_a - only_b) - 1) ** 2 / discordant
+        p_value = stats.chi2.sf(statistic, df=1)
+        method = "chi2"
+
+    return {
+        "only_a_correct": only_a,
+        "only_b_correct": only_b,
+        "statistic": statistic,
+        "p_value": float(p_value),
+        "method": method,
+    }
+
+
+def dump_bootstrap_ci(ci: pd.DataFrame, alpha: float = 0.05):
+    print(f"\nBootstrap {100 * (1 - alpha):.0f}% confidence intervals:")
+    for name, row in ci.iterrows():
+        print(
+            f"{name:<12} {row['estimate']:.4f}  [{row['ci_low']:.4f}, {row['ci_high']:.4f}]"
+        )
@@ -46,9 +46,12 @@ def cleanText(s: str) -> str:
     return s
 
 
-def prepareDataset(
-    df: pd.DataFrame, drop3Stars: bool = False, subSample: int = None
-) -> tuple[pd.Series, pd.Series]:
+def prepareDataFrame(
+    df: pd.DataFrame,
+    drop3Stars: bool = False,
+    subSample: int = None,
+    random_state: int = None,
+) -> pd.DataFrame:
     ## CLEANING
     # keep only the needed columns and clean basic types
     df = df[["Text", "Score"]].dropna()
@@ -66,7 +69,8 @@ def prepareDataset(
     # Optional speed-up: subsample large dataset
     if subSample is not None:
         if len(df) > subSample:
-            df = df.sample(subSample).reset_index(drop=True)
+            # a fixed random_state gives the same subsample on every run
+            df = df.sample(subSample, random_state=random_state).reset_index(drop=True)
         print(f"Training rows: {len(df):,}")
 
     text_col = "Text"
@@ -75,6 +79,19 @@ def prepareDataset(
 
     df["cleaned_text"] = df[text_col].apply(cleanText)
 
+    return df
+
+
+def prepareDataset(
+    df: pd.DataFrame,
+    drop3Stars: bool = False,
+    subSample: int = None,
+    random_state: int = None,
+) -> tuple[pd.Series, pd.Series]:
+    df = prepareDataFrame(
+        df, drop3Stars=drop3Stars, subSample=subSample, random_state=random_state
+    )
+
     X = df["cleaned_text"]
     y = df["sentiment_label"].astype(int)
 
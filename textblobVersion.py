@@ -1,110 +1,181 @@
+import hashlib
+import sys
+import time
+from pathlib import Path
+import joblib
 import kagglehub
+import numpy as np
 import pandas as pd
-import re
-from pathlib import Path
-
-path = kagglehub.dataset_download("snap/amazon-fine-food-reviews")
-
-print("Path to dataset files:", path)
-
-# I/O
-# pointing to reviews imported
+from joblib import Parallel, delayed
+from textblob import TextBlob
+import matplotlib.pyplot as plt
+import preprocessing as pr
 
-reviews_csv = Path(path) / "Reviews.csv"
-assert reviews_csv.exists(), f"Reviews.csv not found in {path}"
-file_path = str(reviews_csv)
+SUBSAMPLE = 50_000
+DROP3STARS = False
+# fixed so reruns score the same subsample and hit the polarity cache
+RANDOM_STATE = 484
+# thresholds: neutral band reduces false positives on short texts
+POSITIVE_THRESHOLD = 0.05
+NEGATIVE_THRESHOLD = -0.05
 
 out_csv = Path("processed_amazon_reviews.csv")
-model_pkl = Path("amazon_sentiment_lr_model.joblib")
-
-# Load CSV
-df = pd.read_csv(file_path)
-
-# ERROR HANDLING
-# ensuring required columns exist
-required = {"Text", "Score"}
-missing = required - set(df.columns)
-assert not missing, f"Missing columns: {missing}"
-
-
-## CLEANING
-# keep only the needed columns and clean basic types
-df = df[["Text", "Score"]].dropna()
-df["Score"] = pd.to_numeric(df["Score"], errors="coerce")
-df = df.dropna(subset=["Score"])
-df["Score"] = df["Score"].astype(int)
-
-
-##### EXPERIMENT
-# optional denoising: drop neutral 3-star reviews to make labels crisper
-# df = df[df["Score"] != 3]
-
-# binary label: 1 = positive (>=4 stars), 0 = negative (<=2 stars) (or 3 if no denoising)
-df["sentiment_label"] = (df["Score"] >= 4).astype(int)
-
-# Optional speed-up: subsample large dataset
-#####EXPERIMENT
-N = 50_000
-if len(df) > N:
-    df = df.sample(N).reset_index(drop=True)
-print(f"Training rows: {len(df):,}")
-
-text_col = "Text"
-assert text_col in df.columns, f"Missing column: {text_col}"
-df[text_col] = df[text_col].fillna("")
-
-# Clean
-
-_url = re.compile(r"http\S+|www\.\S+")
-_mention_hashtag = re.compile(r"[@#]\w+")
-_nonletters = re.compile(r"[^a-zA-Z\s']")
-
-
-# TODO: cleaning seems to not be working rn, at least for links...
-def clean_text(s: str) -> str:
-    s = _url.sub("", s)
-    s = _mention_hashtag.sub("", s)
-    s = _nonletters.sub(" ", s)
-    s = re.sub(r"\s{2,}", " ", s).strip().lower()
-    return s
-
-
-print("Cleaning text...")
-df["cleaned_text"] = df[text_col].apply(clean_text)
-print("Finished cleaning.")
-
-
-from textblob import TextBlob
-import matplotlib.pyplot as plt
+out_png = Path("unsupervised_sentiment_counts.png")
+polarity_cache_pkl = Path("data/textblob_polarity_cache.joblib")
 
 
 def polarity(s: str) -> float:
     return TextBlob(s).sentiment.polarity
 
 
-# thresholds: neutral band reduces false positives on short texts
-def to_label(p: float) -> str:
-    if p > 0.05:
-        return "Positive"
-    if p < -0.05:
-        return "Negative"
-    return "Neutral"
-
-
-df["polarity"] = df["cleaned_text"].apply(polarity)
-df["sentiment"] = df["polarity"].apply(to_label)
-
-df.to_csv(out_csv, index=False)
-print(f"Saved: {out_csv}")
-
-ax = (
-    df["sentiment"]
-    .value_counts()
-    .reindex(["Negative", "Neutral", "Positive"])
-    .plot(kind="bar", title="Sentiment Distribution")
-)
-ax.set_xlabel("Sentiment")
-ax.set_ylabel("Number of comments")
-plt.tight_layout()
-plt.savefig("unsupervised_sentiment_counts.png", dpi=200, bbox_inches="tight")
-print("Saved plot: unsupervised_sentiment_counts.png")
+def _polarity_chunk(texts: list) -> list:
+    # runs inside a worker process; one task per chunk keeps IPC overhead low
+    return [polarity(s) for s in texts]
+
+
+def text_hashes(texts: pd.Series) -> np.ndarray:
+    # stable 64-bit key per cleaned text, used to look up cached polarities
+    return np.fromiter(
+        (
+            int.from_bytes(
+                hashlib.blake2b(s.encode(), digest_size=8).digest(), "little"
+            )
+            for s in texts
+        ),
+        dtype=np.uint64,
+        count=len(texts),
+    )
+
+
+def load_polarity_cache(path: Path = polarity_cache_pkl) -> pd.Series:
+    if path is not None and Path(path).exists():
+        return joblib.load(path)
+    return pd.Series(dtype=np.float64, index=pd.Index([], dtype=np.uint64))
+
+
+def save_polarity_cache(cache: pd.Series, path: Path = polarity_cache_pkl):
+    tmp = Path(path).with_suffix(".joblib.tmp")
+    joblib.dump(cache, tmp)
+    tmp.replace(path)
+
+
+def score_polarity(
+    texts: pd.Series,
+    n_jobs: int = -1,
+    chunk_size: int = 2000,
+    cache_path: Path = polarity_cache_pkl,
+) -> pd.Series:
+    # only texts whose hash is not cached yet are scored, each unique text once,
+    # in chunks spread over worker processes
+    start = time.perf_counter()
+    hashes = text_hashes(texts)
+    cache = load_polarity_cache(cache_path)
+
+    known = cache.reindex(hashes)
+    missing = pd.unique(hashes[known.isna().to_numpy()])
+    print(
+        f"Polarity cache: {len(hashes) - known.isna().sum():,} hits, {len(missing):,} new texts"
+    )
+
+    if len(missing):
+        first_row = pd.Series(np.arange(len(hashes))).groupby(hashes).first()
+        new_texts = texts.iloc[first_row.loc[missing].to_numpy()].tolist()
+        chunks = [
+            new_texts[i : i + chunk_size] for i in range(0, len(new_texts), chunk_size)
+        ]
+        results = Parallel(n_jobs=n_jobs)(delayed(_polarity_chunk)(c) for c in chunks)
+        new_scores = pd.Series(
+            np.concatenate([np.asarray(r, dtype=np.float64) for r in results]),
+            index=pd.Index(missing, dtype=np.uint64),
+        )
+        cache = pd.concat([cache, new_scores])
+        if cache_path is not None:
+            save_polarity_cache(cache, cache_path)
+        known = cache.reindex(hashes)
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"Scored {len(texts):,} rows in {elapsed:.2f}s "
+        f"({len(texts) / max(elapsed, 1e-9):,.0f} rows/s)"
+    )
+    return pd.Series(known.to_numpy(), index=texts.index, name="polarity")
+
+
+def to_label(
+    p: pd.Series, pos: float = POSITIVE_THRESHOLD, neg: float = NEGATIVE_THRESHOLD
+) -> pd.Series:
+    labels = np.select([p > pos, p < neg], ["Positive", "Negative"], "Neutral")
+    return pd.Series(labels, index=p.index, name="sentiment")
+
+
+def run_textblob_pipeline(
+    df: pd.DataFrame,
+    pos: float = POSITIVE_THRESHOLD,
+    neg: float = NEGATIVE_THRESHOLD,
+    n_jobs: int = -1,
+) -> pd.DataFrame:
+    # expects the output of preprocessing.prepareDataFrame
+    df = df.copy()
+    df["polarity"] = score_polarity(df["cleaned_text"], n_jobs=n_jobs)
+    df["sentiment"] = to_label(df["polarity"], pos=pos, neg=neg)
+    return df
+
+
+def make_sentiment_graph(df: pd.DataFrame, path: Path = out_png):
+    ax = (
+        df["sentiment"]
+        .value_counts()
+        .reindex(["Negative", "Neutral", "Positive"])
+        .plot(kind="bar", title="Sentiment Distribution")
+    )
+    ax.set_xlabel("Sentiment")
+    ax.set_ylabel("Number of comments")
+    plt.tight_layout()
+    plt.savefig(path, dpi=200, bbox_inches="tight")
+    print(f"Saved plot: {path}")
+
+
+def relabel(
+    pos: float = POSITIVE_THRESHOLD,
+    neg: float = NEGATIVE_THRESHOLD,
+    csv_path: Path = out_csv,
+) -> pd.DataFrame:
+    # re-applies to_label to the polarities saved by main(), without
+    # downloading, cleaning or scoring anything again
+    df = pd.read_csv(csv_path)
+    df["sentiment"] = to_label(df["polarity"], pos=pos, neg=neg)
+    print(df["sentiment"].value_counts().to_string())
+
+    df.to_csv(csv_path, index=False)
+    print(f"Saved: {csv_path}")
+    make_sentiment_graph(df)
+    return df
+
+
+def main():
+    path = kagglehub.dataset_download("snap/amazon-fine-food-reviews")
+    print("Path to dataset files:", path)
+
+    df = pr.loadData(path)
+
+    print("Cleaning text...")
+    df = pr.prepareDataFrame(
+        df, drop3Stars=DROP3STARS, subSample=SUBSAMPLE, random_state=RANDOM_STATE
+    )
+    print("Finished cleaning.")
+
+    df = run_textblob_pipeline(df)
+
+    df.to_csv(out_csv, index=False)
+    print(f"Saved: {out_csv}")
+
+    make_sentiment_graph(df)
+
+
+if __name__ == "__main__":
+    # python textblobVersion.py relabel <pos> <neg>  -> only re-threshold the saved csv
+    if len(sys.argv) > 1 and sys.argv[1] == "relabel":
+        thresholds = [float(t) for t in sys.argv[2:4]]
+        relabel(*thresholds)
+    else:
+        main()